@@ -7,13 +7,13 @@ uniform velocity displacements on the left-hand side and right-hand side of
 """
 import argparse
 import cProfile
-from io import StringIO
 import numpy as np
 import pathlib
 from peripy import Model
 from peripy.model import initial_crack_helper
 from peripy.integrators import EulerCL, Euler
 from pstats import SortKey, Stats
+import sys
 
 
 # The .msh file is a finite element mesh generated with a finite
@@ -76,9 +76,6 @@ def main():
     # The --opencl argument toggles between OpenCL and cython implementations
     parser.add_argument('--opencl', action='store_const', const=True)
     args = parser.parse_args()
-    if args.profile:
-        profile = cProfile.Profile()
-        profile.enable()
 
     if args.opencl:
         # The :class:`peripy.integrators.EulerCL` class is the OpenCL
@@ -89,6 +86,12 @@ def main():
         # implementation of the explicit Euler integration scheme.
         integrator = Euler(dt=1e-3)
 
+    # Enable profiling only once the arguments have been validated and the
+    # integrator built, so that the profile is not polluted by setup work
+    if args.profile:
+        profile = cProfile.Profile()
+        profile.enable()
+
     # The bond_stiffness, also known as the micromodulus, of the peridynamic
     # bond, using Silling's (2005) derivation for the prototype microelastic
     # brittle (PMB) material model.
@@ -122,10 +125,11 @@ def main():
 
     if args.profile:
         profile.disable()
-        s = StringIO()
-        stats = Stats(profile, stream=s).sort_stats(SortKey.CUMULATIVE)
+        # Stream the stats straight to stdout rather than rendering them
+        # into an intermediate StringIO buffer first
+        stats = Stats(profile, stream=sys.stdout).sort_stats(
+            SortKey.CUMULATIVE)
         stats.print_stats(.05)
-        print(s.getvalue())
 
 
 if __name__ == "__main__":
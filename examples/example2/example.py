@@ -13,13 +13,13 @@ model.
 """
 import argparse
 import cProfile
-from io import StringIO
 import numpy as np
 import pathlib
 from peripy import Model
 from peripy.integrators import VelocityVerletCL
 from peripy.utilities import read_array as read_model
 from pstats import SortKey, Stats
+import sys
 
 
 # The .msh file is a finite element mesh generated with  a finite
@@ -138,16 +138,11 @@ def main():
     # Strain energy release rate of concrete (approximate)
     strain_energy_release_rate = 100.0
     # Critical stretch
-    critical_stretch = np.power(
-        np.divide(
-            5 * strain_energy_release_rate, 6 * youngs_modulus * horizon), (
-                1. / 2))
+    critical_stretch = (
+        5 * strain_energy_release_rate / (
+            6 * youngs_modulus * horizon)) ** 0.5
     bulk_modulus = youngs_modulus / (3 * (1 - 2 * poisson_ratio))
-    bond_stiffness = (18.00 * bulk_modulus) / (np.pi * np.power(horizon, 4))
-
-    if args.profile:
-        profile = cProfile.Profile()
-        profile.enable()
+    bond_stiffness = (18.00 * bulk_modulus) / (np.pi * horizon**4)
 
     # Increasing the dynamic relaxation damping constant to a critical value
     # will help the system to converge to the quasi-static steady-state.
@@ -181,6 +176,13 @@ def main():
     else:
         connectivity = None
 
+    # Enable profiling only once the arguments have been validated and the
+    # model arrays read from file, so that the profile is not polluted by
+    # setup work
+    if args.profile:
+        profile = cProfile.Profile()
+        profile.enable()
+
     if ((volume is not None) and
             (density is not None) and
             (family is not None) and
@@ -241,10 +243,11 @@ def main():
 
     if args.profile:
         profile.disable()
-        s = StringIO()
-        stats = Stats(profile, stream=s).sort_stats(SortKey.CUMULATIVE)
+        # Stream the stats straight to stdout rather than rendering them
+        # into an intermediate StringIO buffer first
+        stats = Stats(profile, stream=sys.stdout).sort_stats(
+            SortKey.CUMULATIVE)
         stats.print_stats(.05)
-        print(s.getvalue())
 
 
 if __name__ == "__main__":
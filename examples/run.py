@@ -40,6 +40,18 @@ import subprocess
 
 HERE = os.path.dirname(__file__) or '.'
 
+# Paths ignored by get_all_examples, resolved once at import so that
+# membership tests are O(1) set probes
+_IGNORE = frozenset(
+    os.path.abspath(os.path.join(HERE, *pth))
+    for pth in [['run.py'],
+                ['example3'],
+                ['example3', 'profiling'],
+                ['example3', 'damage models'],
+                ['example3', 'SS'],
+                ['example3', 'profiling', 'txt'],
+                ['example4']])
+
 
 def _exec_file(filename):
     ns = {'__name__': '__main__', '__file__': filename}
@@ -67,23 +79,14 @@ def _get_module(fname):
 
 def example_info(module, filename):
     """Print example information."""
-    print("Information for example: %s" % module)
-    print(_extract_full_doc(filename))
+    print("Information for example: %s\n%s"
+          % (module, _extract_full_doc(filename)))
 
 
 def get_all_examples():
     """Get all of the examples."""
     basedir = HERE
     examples = []
-    _ignore = [['run.py'],
-               ['example3'],
-               ['example3', 'profiling'],
-               ['example3', 'damage models'],
-               ['example3', 'SS'],
-               ['example3', 'profiling', 'txt'],
-               ['example4']]
-    ignore = [os.path.abspath(os.path.join(basedir, *pth))
-              for pth in _ignore]
     for dirpath, dirs, files in os.walk(basedir):
         rel_dir = os.path.relpath(dirpath, basedir)
         if rel_dir == '.':
@@ -96,8 +99,8 @@ def get_all_examples():
             full_path = os.path.join(basedir, path)
             dirname = os.path.dirname(full_path)
             full_dirname = os.path.join(basedir, dirname)
-            if ((os.path.abspath(full_path) in ignore)
-                    or (os.path.abspath(full_dirname) in ignore)):
+            if ((os.path.abspath(full_path) in _IGNORE)
+                    or (os.path.abspath(full_dirname) in _IGNORE)):
                 continue
             module = _get_module(path)
             doc = _extract_short_doc(dirpath, f)
@@ -162,8 +165,8 @@ def cat_example(module):
 def list_examples(examples):
     """List example."""
     for idx, (module, doc) in enumerate(examples):
-        print("%d. %s" % (idx + 1, module[len('peripy.examples.'):]))
-        print("   %s" % doc)
+        print("%d. %s\n   %s"
+              % (idx + 1, module[len('peripy.examples.'):], doc))
 
 
 def run_command(module, args):
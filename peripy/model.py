@@ -9,12 +9,24 @@ from .correction import (set_volume_correction,
 from collections import namedtuple
 import numpy as np
 import pathlib
-from tqdm import trange
 import warnings
 import meshio
 import sklearn.neighbors as neighbors
 
 _MeshElements = namedtuple("MeshElements", ["connectivity", "boundary"])
+
+# Shared return value for the dummy boundary condition and tip functions.
+# The boundary condition assembly only reads the returned list, so a single
+# instance can be shared by every call instead of allocating a fresh list
+# per node
+_NO_BOUNDARY = [None, None, None]
+
+
+def _no_boundary(x):
+    """Return no boundary or tip for any node, as the dummy callback."""
+    return _NO_BOUNDARY
+
+
 _mesh_elements_2d = _MeshElements(connectivity="triangle",
                                   boundary="line")
 _mesh_elements_3d = _MeshElements(connectivity="tetra",
@@ -237,19 +249,11 @@ class Model(object):
                 transfinite, volume_total)
             if self.write_path is not None:
                 write_array(self.write_path, "volume", self.volume)
-        elif type(volume) == np.ndarray:
-            if np.shape(volume) != (self.nnodes, ):
-                raise ValueError("volume shape is wrong, and must be "
-                                 "(nnodes, ) (expected {}, got {})".format(
-                                     (self.nnodes, ),
-                                     np.shape(volume)))
+        else:
+            self.volume = self._validate_ndarray(
+                volume, "volume", (self.nnodes, ), np.float64)
             warnings.warn(
                     "Reading volume from argument.")
-            self.volume = volume.astype(np.float64)
-        else:
-            raise TypeError("volume type is wrong (expected {}, got "
-                            "{})".format(type(volume),
-                                         np.ndarray))
 
         if volume_correction is not None:
             if not ((type(node_radius) == float)
@@ -288,19 +292,10 @@ class Model(object):
                 write_array(self.write_path, "n_neigh", n_neigh)
         else:
 
-            if type(family) == np.ndarray:
-                if np.shape(family) != (self.nnodes, ):
-                    raise ValueError("family shape is wrong, and must be "
-                                     "(nnodes, ) (expected {}, got {})".format(
-                                         (self.nnodes, ),
-                                         np.shape(family)))
-                warnings.warn(
-                        "Reading family from argument.")
-                self.family = family.astype(np.intc)
-            elif type(family) != np.ndarray:
-                raise TypeError("family type is wrong (expected {}, got "
-                                "{})".format(type(family),
-                                             np.ndarray))
+            self.family = self._validate_ndarray(
+                family, "family", (self.nnodes, ), np.intc)
+            warnings.warn(
+                    "Reading family from argument.")
 
             if type(connectivity) == tuple:
                 if len(connectivity) != 2:
@@ -311,21 +306,21 @@ class Model(object):
                 nlist, n_neigh = connectivity
                 nlist = nlist.astype(np.intc)
                 n_neigh = n_neigh.astype(np.intc)
+                # Do the O(nnodes) family reduction once and read the nlist
+                # shape once, rather than repeating them in each branch
+                max_family = int(self.family.max())
+                self.max_neighbours = np.intc(
+                    np.shape(nlist)[1]
+                    )
                 if integrator.context is None:
-                    self.max_neighbours = np.intc(
-                                np.shape(nlist)[1]
-                            )
-                    if self.max_neighbours != self.family.max():
+                    if self.max_neighbours != max_family:
                         raise ValueError(
                             "max_neighbours, which is equal to the"
                             " size of axis 1 of nlist is wrong (expected "
                             " max_neighbours = np.shape(nlist)[1] = "
                             "family.max() = {}, got {})".format(
-                                self.family.max(), self.max_neighbours))
+                                max_family, self.max_neighbours))
                 else:
-                    self.max_neighbours = np.intc(
-                        np.shape(nlist)[1]
-                        )
                     test = self.max_neighbours - 1
                     if self.max_neighbours & test:
                         raise ValueError(
@@ -333,7 +328,7 @@ class Model(object):
                             " size of axis 1 of nlist is wrong (expected "
                             " max_neighbours = np.shape(nlist)[1] = {},"
                             " got {})".format(
-                                1 << (int(self.family.max() - 1)).bit_length(),
+                                1 << (max_family - 1).bit_length(),
                                 self.max_neighbours))
             else:
                 raise TypeError("connectivity type is wrong (expected {} or"
@@ -348,65 +343,53 @@ class Model(object):
 
         # Calculate stiffness corrections if None is provided
         if stiffness_corrections is None:
-            stiffness_correction_factors_are_applied = False
-            stiffness_corrections = np.ones(
-                (self.nnodes, self.max_neighbours), dtype=np.float64)
-            if micromodulus_function is not None:
-                # Apply micromodulus function
-                # Calculate the micromodulus function values
-                stiffness_corrections = self._set_micromodulus_values(
-                    micromodulus_function, stiffness_corrections, horizon)
-                stiffness_correction_factors_are_applied = True
-            if volume_correction is not None:
-                # Apply volume correction algorithm
-                # Calculate the volume correction factors
-                stiffness_corrections = self._set_volume_corrections(
-                    volume_correction, stiffness_corrections, node_radius,
-                    horizon)
-                stiffness_correction_factors_are_applied = True
-            if surface_correction is not None:
-                # Apply surface correction algorithm
-                # Calculate the stiffness correction factors
-                stiffness_corrections = self._set_surface_corrections(
-                    surface_correction, stiffness_corrections)
-                stiffness_correction_factors_are_applied = True
-            if stiffness_correction_factors_are_applied:
+            if ((micromodulus_function is None)
+                    and (volume_correction is None)
+                    and (surface_correction is None)):
+                # Stiffness corrections factors are not applied, so the
+                # (nnodes, max_neighbours) array of ones is never needed.
+                # This results in speedups in the memory constrained case
+                self.stiffness_corrections = None
+            else:
+                stiffness_corrections = np.ones(
+                    (self.nnodes, self.max_neighbours), dtype=np.float64)
+                if micromodulus_function is not None:
+                    # Apply micromodulus function
+                    # Calculate the micromodulus function values
+                    stiffness_corrections = self._set_micromodulus_values(
+                        micromodulus_function, stiffness_corrections, horizon)
+                if volume_correction is not None:
+                    # Apply volume correction algorithm
+                    # Calculate the volume correction factors
+                    stiffness_corrections = self._set_volume_corrections(
+                        volume_correction, stiffness_corrections, node_radius,
+                        horizon)
+                if surface_correction is not None:
+                    # Apply surface correction algorithm
+                    # Calculate the stiffness correction factors
+                    stiffness_corrections = self._set_surface_corrections(
+                        surface_correction, stiffness_corrections)
                 self.stiffness_corrections = stiffness_corrections
                 # Write the stiffness_corrections to file
                 if self.write_path is not None:
                     write_array(
                         self.write_path,
                         "stiffness_corrections", stiffness_corrections)
-            else:
-                # Stiffness corrections factors are not applied
-                # This results in speedups in the memory constrained case
-                self.stiffness_corrections = None
-        elif type(stiffness_corrections) == np.ndarray:
-            if np.shape(stiffness_corrections) != (
-                    self.nnodes, self.max_neighbours):
-                raise ValueError("stiffness_corrections shape is wrong, "
-                                 "and must be (nnodes, max_neighbours) "
-                                 "(expected {}, got {})".format(
-                                     (self.nnodes, self.max_neighbours),
-                                     np.shape(stiffness_corrections)))
-            else:
-                warnings.warn(
-                    "Reading stiffness_corrections from argument and "
-                    "overriding surface_correction (={}), volume_correction "
-                    "(={}) and micromodulus_function (={}) flags! If these "
-                    "flags have changed since the stiffness_corrections were "
-                    "written to file, please remove the stiffness_corrections "
-                    "argument and overwrite existing stiffness_corrections "
-                    "with the stiffness_corrections calculated using the new "
-                    "flags.".format(
-                        surface_correction, volume_correction,
-                        micromodulus_function))
-                self.stiffness_corrections = (
-                    stiffness_corrections.astype(np.float64))
         else:
-            raise TypeError("stiffness_corrections type is wrong (expected {}"
-                            ", got {})".format(
-                                    np.ndarray, type(stiffness_corrections)))
+            self.stiffness_corrections = self._validate_ndarray(
+                stiffness_corrections, "stiffness_corrections",
+                (self.nnodes, self.max_neighbours), np.float64)
+            warnings.warn(
+                "Reading stiffness_corrections from argument and "
+                "overriding surface_correction (={}), volume_correction "
+                "(={}) and micromodulus_function (={}) flags! If these "
+                "flags have changed since the stiffness_corrections were "
+                "written to file, please remove the stiffness_corrections "
+                "argument and overwrite existing stiffness_corrections "
+                "with the stiffness_corrections calculated using the new "
+                "flags.".format(
+                    surface_correction, volume_correction,
+                    micromodulus_function))
 
         # Create dummy is_bond_type function if None is provided
         if is_bond_type is None:
@@ -427,40 +410,23 @@ class Model(object):
                 self.initial_connectivity, is_bond_type,
                 self.nbond_types, self.nregimes)
 
-        elif type(bond_types) == np.ndarray:
-            if np.shape(bond_types) != (self.nnodes, self.max_neighbours):
-                raise ValueError("bond_types shape is wrong, "
-                                 "and must be (nnodes, max_neighbours) "
-                                 "(expected {}, got {})".format(
-                                     (self.nnodes, self.max_neighbours),
-                                     np.shape(bond_types)))
+        else:
+            self.bond_types = self._validate_ndarray(
+                bond_types, "bond_types",
+                (self.nnodes, self.max_neighbours), np.intc)
             warnings.warn(
                 "Reading bond_types from argument.")
-            self.bond_types = bond_types.astype(np.intc)
-        else:
-            raise TypeError("bond_types type is wrong (expected {}"
-                            ", got {})".format(
-                                    np.ndarray, type(bond_types)))
 
         # Set densities of the model
         self.densities = self._set_densities(density, is_density)
 
-        # Create dummy boundary conditions functions if None is provided
+        # Use the dummy boundary conditions function if None is provided
         if is_force_boundary is None:
-            def is_force_boundary(x):
-                # Node does not live on forces boundary
-                bnd = [None, None, None]
-                return bnd
+            is_force_boundary = _no_boundary
         if is_displacement_boundary is None:
-            def is_displacement_boundary(x):
-                # Node does not live on displacement boundary
-                bnd = [None, None, None]
-                return bnd
+            is_displacement_boundary = _no_boundary
         if is_tip is None:
-            def is_tip(x):
-                # Node does not live on tip
-                bnd = [None, None, None]
-                return bnd
+            is_tip = _no_boundary
 
         # Apply boundary conditions
         (self.bc_types,
@@ -489,8 +455,10 @@ class Model(object):
         """
         mesh = meshio.read(filename)
 
-        # Get coordinates, encoded as mesh points
-        self.coords = np.array(mesh.points, dtype=np.float64)
+        # Get coordinates, encoded as mesh points. ascontiguousarray is a
+        # no-op copy-wise when meshio already supplies a C-contiguous
+        # float64 array, unlike np.array which always copies
+        self.coords = np.ascontiguousarray(mesh.points, dtype=np.float64)
         self.nnodes = self.coords.shape[0]
 
         if not transfinite:
@@ -502,6 +470,40 @@ class Model(object):
             # Get boundary connectivity, mesh lines
             self.mesh_boundary = mesh.cells_dict[self.mesh_elements.boundary]
 
+        # Only the extracted arrays are needed past this point; drop the
+        # meshio object so its cell blocks do not double peak memory during
+        # the neighbour list build
+        del mesh
+
+    def _validate_ndarray(self, array, name, expected_shape, dtype):
+        """
+        Validate a user-supplied array argument.
+
+        :arg array: The array to validate.
+        :type array: :class:`numpy.ndarray`
+        :arg str name: The name of the argument, used in the exception
+            messages.
+        :arg tuple expected_shape: The required shape of the array.
+        :arg dtype: The data type the validated array is converted to.
+        :type dtype: :class:`numpy.dtype`
+
+        :raises TypeError: when array is not a :class:`numpy.ndarray`.
+        :raises ValueError: when array does not have expected_shape.
+
+        :returns: The array, as a C-contiguous array of the given dtype.
+        :rtype: :class:`numpy.ndarray`
+        """
+        if type(array) != np.ndarray:
+            raise TypeError("{} type is wrong (expected {}, got "
+                            "{})".format(name, np.ndarray, type(array)))
+        if np.shape(array) != expected_shape:
+            raise ValueError("{} shape is wrong (expected {}, got "
+                             "{})".format(name, expected_shape,
+                                          np.shape(array)))
+        # astype always returns a C-contiguous copy, which the Cython and
+        # OpenCL kernels require
+        return array.astype(dtype)
+
     def write_mesh(self, filename, damage=None, displacements=None,
                    file_format=None):
         """
@@ -564,25 +566,33 @@ class Model(object):
         tree = neighbors.KDTree(coords, leaf_size=160)
         neighbour_list = tree.query_radius(
             coords, r=horizon)
-        # Remove identity values, as there is no bond between a node and itself
-        neighbour_list = [
-            neighbour_list[i][neighbour_list[i] != i]
-            for i in range(nnodes)]
 
-        family = [len(neighbour_list[i]) for i in range(nnodes)]
-        family = np.array(family, dtype=np.intc)
+        # The query result for each node includes the node itself, which is
+        # removed below, as there is no bond between a node and itself
+        counts = np.fromiter(
+            map(len, neighbour_list), dtype=np.intc, count=nnodes)
+        family = counts - 1
 
         if context:
             max_neighbours = np.intc(
                 1 << (int(family.max() - 1)).bit_length())
-            nlist = -1.*np.ones((nnodes, max_neighbours),
-                                dtype=np.intc)
+            nlist = np.full((nnodes, max_neighbours), -1, dtype=np.intc)
         else:
             max_neighbours = family.max()
             nlist = np.zeros((nnodes, max_neighbours), dtype=np.intc)
-        for i in range(nnodes):
-            nlist[i][:family[i]] = neighbour_list[i]
-        nlist = nlist.astype(np.intc)
+
+        # Scatter the query result into the fixed-length neighbour list in
+        # one array operation, rather than filtering and copying one node at
+        # a time. The identity values are masked out of the flattened result
+        # and the remaining neighbours keep their position within each row
+        flat = np.concatenate(neighbour_list)
+        rows = np.repeat(np.arange(nnodes), counts)
+        keep = flat != rows
+        flat = flat[keep]
+        rows = rows[keep]
+        row_starts = np.cumsum(family) - family
+        cols = np.arange(flat.size) - np.repeat(row_starts, family)
+        nlist[rows, cols] = flat
         n_neigh = family.copy()
 
         if initial_crack is not None:
@@ -623,34 +633,47 @@ class Model(object):
             tmp = volume_total / self.nnodes
             volume = tmp * np.ones(self.nnodes)
         else:
+            # Calculate the volume (or area) of every element in one batch
+            # of array operations rather than one element at a time
+            element_coords = self.coords[self.mesh_connectivity]
+            # The cross and dot products are expanded into elementwise
+            # ufunc expressions on contiguous column arrays, which
+            # autovectorize better than the generic np.cross and np.einsum
+            # routines and avoid their temporary (nelem, 3) results
             if dimensions == 2:
                 # element is a triangle
                 element_nodes = 3
+                a = element_coords[:, 0]
+                ix, iy, iz = (element_coords[:, 1] - a).T
+                jx, jy, jz = (element_coords[:, 2] - a).T
+
+                # Areas of the triangles, 0.5*|i x j|
+                cx = iy * jz - iz * jy
+                cy = iz * jx - ix * jz
+                cz = ix * jy - iy * jx
+                element_volumes = 0.5 * np.sqrt(
+                    cx * cx + cy * cy + cz * cz)
             elif dimensions == 3:
                 # element is a tetrahedron
                 element_nodes = 4
-
-            for nodes in self.mesh_connectivity:
-                # Calculate volume/area or element
-                if dimensions == 2:
-                    a, b, c = self.coords[nodes]
-
-                    # Area of a trianble
-                    i = b - a
-                    j = c - a
-                    element_volume = 0.5 * np.linalg.norm(np.cross(i, j))
-                elif dimensions == 3:
-                    a, b, c, d = self.coords[nodes]
-
-                    # Volume of a tetrahedron
-                    i = a - d
-                    j = b - d
-                    k = c - d
-                    element_volume = abs(np.dot(i, np.cross(j, k))) / 6
-
-                # Add fraction element volume to all nodes belonging to that
-                # element
-                volume[nodes] += element_volume / element_nodes
+                d = element_coords[:, 3]
+                ix, iy, iz = (element_coords[:, 0] - d).T
+                jx, jy, jz = (element_coords[:, 1] - d).T
+                kx, ky, kz = (element_coords[:, 2] - d).T
+
+                # Volumes of the tetrahedra, |i . (j x k)|/6
+                cx = jy * kz - jz * ky
+                cy = jz * kx - jx * kz
+                cz = jx * ky - jy * kx
+                element_volumes = np.abs(
+                    ix * cx + iy * cy + iz * cz) / 6
+
+            # Add fraction element volume to all nodes belonging to each
+            # element. np.add.at accumulates correctly for nodes shared by
+            # several elements, where fancy-indexed += would not
+            np.add.at(
+                volume, self.mesh_connectivity,
+                (element_volumes / element_nodes)[:, np.newaxis])
         volume = volume.astype(np.float64)
         return volume
 
@@ -736,43 +759,60 @@ class Model(object):
                 raise TypeError(
                     "is_bond_type must be a *function*.")
             nlist, n_neigh = connectivity
+            # Validate the return type of the callback once on the first
+            # bond, rather than once per bond
+            bond_type = is_bond_type(
+                self.coords[0, :], self.coords[nlist[0][0], :])
+            if type(bond_type) is not int:
+                raise TypeError(
+                    "is_bond_type must be a function that returns an "
+                    "*int* (expected {}, got {})".format(
+                        int, type(bond_type)))
+            # Find the valid bonds with a single broadcast comparison
+            # against n_neigh, evaluate the callback over those bonds only
+            # and scatter the results into the padded array in one write
             bond_types = np.zeros(
-                (self.nnodes, self.max_neighbours))
-            for i in range(self.nnodes):
-                for neigh in range(n_neigh[i]):
-                    j = nlist[i][neigh]
-                    bond_type = is_bond_type(
-                        self.coords[i, :], self.coords[j, :])
-                    if type(bond_type) is not int:
-                        raise TypeError(
-                            "is_bond_type must be a function that returns an "
-                            "*int* (expected {}, got {})".format(
-                                int, type(bond_type)))
-                    if bond_type < 0:
-                        raise ValueError(
-                            "is_bond_type must be a function that returns a "
-                            "*positive* int or 0 (got {})".format(
-                                bond_type))
-                    if bond_type > nbond_types - 1:
-                        raise ValueError(
-                            "is_bond_type must be a function that returns a "
-                            "positive int or 0 which is *less* than "
-                            "nbond_types (the number of different bonds, "
-                            "nbond_types = {}, got is_bond_type = {} for "
-                            "node coordinate pair {}, {})".format(
-                                nbond_types,
-                                bond_type,
-                                self.coords[i, :],
-                                self.coords[j, :]
-                                ))
-                    bond_types[i][neigh] = bond_type
-            bond_types = bond_types.astype(np.intc)
+                (self.nnodes, self.max_neighbours), dtype=np.intc)
+            mask = np.arange(
+                self.max_neighbours)[np.newaxis, :] < n_neigh[:, np.newaxis]
+            node_i, neigh_i = np.nonzero(mask)
+            node_j = nlist[node_i, neigh_i]
+            coords = self.coords
+            # Scatter through the flat view, which is cheaper than 2-D
+            # fancy-index assignment
+            bond_types.ravel()[node_i * self.max_neighbours + neigh_i] \
+                = np.fromiter(
+                (is_bond_type(coords[i, :], coords[j, :])
+                 for i, j in zip(node_i, node_j)),
+                dtype=np.intc, count=node_i.size)
+            # Validate the range of the bond types with array reductions,
+            # hoisting the per-bond checks out of the loop. The padding
+            # values beyond n_neigh are zero and pass both checks
+            if np.any(bond_types < 0):
+                i, neigh = np.argwhere(bond_types < 0)[0]
+                raise ValueError(
+                    "is_bond_type must be a function that returns a "
+                    "*positive* int or 0 (got {})".format(
+                        int(bond_types[i][neigh])))
+            if np.any(bond_types > nbond_types - 1):
+                i, neigh = np.argwhere(bond_types > nbond_types - 1)[0]
+                j = nlist[i][neigh]
+                raise ValueError(
+                    "is_bond_type must be a function that returns a "
+                    "positive int or 0 which is *less* than "
+                    "nbond_types (the number of different bonds, "
+                    "nbond_types = {}, got is_bond_type = {} for "
+                    "node coordinate pair {}, {})".format(
+                        nbond_types,
+                        int(bond_types[i][neigh]),
+                        self.coords[i, :],
+                        self.coords[j, :]
+                        ))
             if self.write_path is not None:
                 write_array(self.write_path, "bond_types", bond_types)
         elif nregimes != 1:
             bond_types = np.zeros(
-                (self.nnodes, self.max_neighbours))
-            bond_types = bond_types.astype(np.intc)
+                (self.nnodes, self.max_neighbours), dtype=np.intc)
             if self.write_path is not None:
                 write_array(self.write_path, "bond_types", bond_types)
         else:
@@ -917,10 +957,10 @@ class Model(object):
         nlist, n_neigh = self.initial_connectivity
 
         if self.dimensions == 2:
-            family_volume_bulk = np.float64(np.pi*np.power(self.horizon, 2))
+            family_volume_bulk = np.float64(np.pi*self.horizon**2)
         elif self.dimensions == 3:
             family_volume_bulk = np.float64(
-                (4./3)*np.pi*np.power(self.horizon, 3))
+                (4./3)*np.pi*self.horizon**3)
 
         if surface_correction == 1:
             set_precise_surface_correction(
@@ -1004,9 +1044,9 @@ class Model(object):
                 elif np.shape(bond_stiffness[0]) == (1,):
                     nregimes = 1
                     nbond_types = np.shape(bond_stiffness)[0]
-                    bond_stiffness = np.array(
+                    bond_stiffness = np.ascontiguousarray(
                         bond_stiffness, dtype=np.float64)
-                    critical_stretch = np.array(
+                    critical_stretch = np.ascontiguousarray(
                         critical_stretch, dtype=np.float64)
                     plus_cs = np.zeros(nbond_types)
                     plus_cs = plus_cs.astype(np.float64)
@@ -1014,60 +1054,43 @@ class Model(object):
                     nbond_types = 1
                     nregimes = np.shape(bond_stiffness)[0]
 
-                    if not all(
-                        critical_stretch[i] <= critical_stretch[i + 1]
-                            for i in range(nregimes-1)):
+                    if np.any(np.diff(critical_stretch) < 0):
                         raise DamageModelError(critical_stretch)
 
-                    bond_stiffness = np.array(
+                    bond_stiffness = np.ascontiguousarray(
                         bond_stiffness, dtype=np.float64)
-                    critical_stretch = np.array(
+                    critical_stretch = np.ascontiguousarray(
                         critical_stretch, dtype=np.float64)
+                    # The bond force density at 0 stretch is 0, and each
+                    # subsequent `+ c` follows from the previous one by
+                    # adding the jump at the regime boundary, i.e. a prefix
+                    # sum over the regimes
                     plus_cs = np.zeros(nregimes)
-                    c_i = 0.0
-                    # The bond force density at 0 stretch is 0
-                    plus_cs[0] = c_i
-                    c_prev = c_i
-                    for r in range(1, nregimes):
-                        c_i = (
-                            c_prev
-                            + (bond_stiffness[r - 1] *
-                                critical_stretch[r - 1])
-                            - (bond_stiffness[r] *
-                               critical_stretch[r - 1]))
-                        plus_cs[r] = c_i
-                        c_prev = c_i
-                    plus_cs = plus_cs.astype(np.float64)
+                    plus_cs[1:] = np.cumsum(
+                        bond_stiffness[:-1] * critical_stretch[:-1]
+                        - bond_stiffness[1:] * critical_stretch[:-1])
                 else:
                     nregimes = np.shape(bond_stiffness)[1]
                     nbond_types = np.shape(bond_stiffness)[0]
 
-                    for i in range(nbond_types):
-                        if not all(
-                            critical_stretch[i][j] <=
-                                critical_stretch[i][j + 1]
-                                for j in range(nregimes-1)):
-                            raise DamageModelError(critical_stretch[i])
+                    unsorted_bond_types = np.any(
+                        np.diff(critical_stretch, axis=1) < 0, axis=1)
+                    if np.any(unsorted_bond_types):
+                        i = np.argwhere(unsorted_bond_types)[0][0]
+                        raise DamageModelError(critical_stretch[i])
 
-                    bond_stiffness = np.array(
+                    bond_stiffness = np.ascontiguousarray(
                         bond_stiffness, dtype=np.float64)
-                    critical_stretch = np.array(
+                    critical_stretch = np.ascontiguousarray(
                         critical_stretch, dtype=np.float64)
+                    # As in the single bond type case, the `+ c`s are a
+                    # prefix sum of the jumps at the regime boundaries, here
+                    # along the regimes axis for every bond type at once
                     plus_cs = np.zeros((nbond_types, nregimes))
-                    c_i = np.zeros(nbond_types)
-                    # The bond force density at 0 stretch is 0
-                    plus_cs[:, 0] = c_i
-                    c_prev = c_i
-                    for r in range(1, nregimes):
-                        c_i = (
-                            c_prev
-                            + (bond_stiffness[:, r - 1] *
-                                critical_stretch[:, r - 1])
-                            - (bond_stiffness[:, r] *
-                               critical_stretch[:, r - 1]))
-                        plus_cs[:, r] = c_i
-                        c_prev = c_i
-                    plus_cs = plus_cs.astype(np.float64)
+                    plus_cs[:, 1:] = np.cumsum(
+                        bond_stiffness[:, :-1] * critical_stretch[:, :-1]
+                        - bond_stiffness[:, 1:] * critical_stretch[:, :-1],
+                        axis=1)
         elif ((type(bond_stiffness) is float) or
               (type(bond_stiffness) is np.float64)):
             nregimes = 1
@@ -1137,11 +1160,14 @@ class Model(object):
         for function in functions:
             if not callable(functions[function]):
                 raise TypeError("{} must be a *function*.".format(function))
-            if type(functions[function](self.coords[0][:])) is not list:
+            # Evaluate the callback on the first node once and validate the
+            # returned value
+            returned = functions[function](self.coords[0])
+            if type(returned) is not list:
                 raise TypeError(
                     "{} must be a function that returns a *list*.".format(
                         function))
-            if len(functions[function](self.coords[0][:])) != 3:
+            if len(returned) != 3:
                 if function == 'is_tip':
                     raise TypeError("{} must be a function that returns a list"
                                     " of length *3* of ints or strings or "
@@ -1163,50 +1189,65 @@ class Model(object):
             tip_types[str(tip)].append((i, j))
             return tip_types, ntips
 
-        bc_types = np.zeros(
-            (self.nnodes, self.degrees_freedom), dtype=np.intc)
-        bc_values = np.zeros(
-            (self.nnodes, self.degrees_freedom), dtype=np.float64)
-        force_bc_types = np.zeros(
-            (self.nnodes, self.degrees_freedom), dtype=np.intc)
-        force_bc_values = np.zeros(
-            (self.nnodes, self.degrees_freedom), dtype=np.float64)
+        # The dummy callbacks return no boundary for every node, so their
+        # arrays can be allocated directly without evaluating the callback
+        # once per node
+        if is_displacement_boundary is _no_boundary:
+            bc_types = np.zeros(
+                (self.nnodes, self.degrees_freedom), dtype=np.intc)
+            bc_values = np.zeros(
+                (self.nnodes, self.degrees_freedom), dtype=np.float64)
+        else:
+            # Evaluate the displacement boundary condition for every node,
+            # then assemble the types and values arrays with a single mask
+            # operation rather than assigning one scalar at a time
+            displacement_bnd = np.array(
+                [is_displacement_boundary(x) for x in self.coords])
+            displacement_mask = displacement_bnd != None  # noqa: E711
+            bc_types = displacement_mask.astype(np.intc)
+            bc_values = np.where(
+                displacement_mask, displacement_bnd, 0.0).astype(np.float64)
+        if is_force_boundary is _no_boundary:
+            force_bc_types = np.zeros(
+                (self.nnodes, self.degrees_freedom), dtype=np.intc)
+            force_bc_values = np.zeros(
+                (self.nnodes, self.degrees_freedom), dtype=np.float64)
+        else:
+            # Evaluate the force boundary condition for every node and
+            # assemble the types and values arrays from a boolean mask over
+            # the results. The nodal forces are scaled by the nodal volumes,
+            # which is a no-op for the zero values off the boundary
+            forces_bnd = np.array(
+                [is_force_boundary(x) for x in self.coords])
+            forces_mask = forces_bnd != None  # noqa: E711
+            force_bc_types = forces_mask.astype(np.intc)
+            force_bc_values = np.where(
+                forces_mask, forces_bnd, 0.0).astype(np.float64)
+            force_bc_values /= self.volume[:, np.newaxis]
+            num_force_bc_nodes = np.count_nonzero(forces_mask.any(axis=1))
+            if num_force_bc_nodes != 0:
+                force_bc_values /= num_force_bc_nodes
+
         tip_types = {}
-        num_force_bc_nodes = 0
         ntips = {'model': self.nnodes}
-        for i in range(self.nnodes):
-            bnd = is_displacement_boundary(self.coords[i][:])
-            forces_bnd = is_force_boundary(self.coords[i][:])
-            tip = is_tip(self.coords[i][:])
-            is_force_node = 0
-            for j in range(self.degrees_freedom):
-                forces_bnd_j = forces_bnd[j]
-                bnd_j = bnd[j]
-                tip_j = tip[j]
-                # Define boundary types and values
-                if bnd_j is not None:
-                    bc_types[i, j] = np.intc(1)
-                    bc_values[i, j] = np.float64(bnd_j)
-                # Define forces boundary types and values
-                if forces_bnd_j is not None:
-                    is_force_node = 1
-                    force_bc_types[i, j] = np.intc(1)
-                    force_bc_values[i, j] = np.float64(
-                        forces_bnd_j / self.volume[i])
-
-                if tip_j is not None:
-                    if type(tip_j) is tuple:
-                        for tip_jk in tip_j:
+        # Hoist the loop-invariant attribute lookups out of the per-node
+        # loop, and skip the loop entirely for the dummy callback, which
+        # never finds a tip
+        coords = self.coords
+        degrees_freedom = self.degrees_freedom
+        if is_tip is not _no_boundary:
+            for i in range(self.nnodes):
+                tip = is_tip(coords[i])
+                for j in range(degrees_freedom):
+                    tip_j = tip[j]
+                    if tip_j is not None:
+                        if type(tip_j) is tuple:
+                            for tip_jk in tip_j:
+                                tip_types, ntips = set_tip(
+                                    tip_jk, i, j, tip_types, ntips)
+                        else:
                             tip_types, ntips = set_tip(
-                                tip_jk, i, j, tip_types, ntips)
-                    else:
-                        tip_types, ntips = set_tip(
-                            tip_j, i, j, tip_types, ntips)
-
-            num_force_bc_nodes += is_force_node
-        if num_force_bc_nodes != 0:
-            force_bc_values = np.float64(
-                np.divide(force_bc_values, num_force_bc_nodes))
+                                tip_j, i, j, tip_types, ntips)
 
         return (bc_types, bc_values, force_bc_types, force_bc_values,
                 tip_types, ntips)
@@ -1292,6 +1333,21 @@ class Model(object):
              displacement_bc_magnitudes, force_bc_magnitudes, connectivity,
              bond_stiffness, critical_stretch, write_path)
 
+        # Convert the tip node lists to index arrays once, so that each
+        # write step reduces over the tips with fancy-indexed sums rather
+        # than a Python loop over nodes
+        tip_indices = {
+            tip_type: tuple(np.transpose(node_list))
+            for tip_type, node_list in self.tip_types.items()}
+
+        # Precompute the damage warning thresholds checked at write steps
+        damage_warning_lo = 0.05 * self.nnodes
+        damage_warning_hi = 0.7 * self.nnodes
+
+        # Import tqdm lazily so that importing the module does not pay for
+        # the progress bar machinery, which is only used here
+        from tqdm import trange
+
         for step in trange(first_step, first_step+steps,
                            desc="Simulation Progress", unit="steps"):
 
@@ -1317,7 +1373,7 @@ class Model(object):
                     # Write index number
                     ii = step // write - (first_step - 1) // write - 1
 
-                    for tip_type, node_list in self.tip_types.items():
+                    for tip_type, (tip_i, tip_j) in tip_indices.items():
                         if tip_type not in data:
                             # Build data dict for this tip type
                             data[tip_type] = {
@@ -1332,19 +1388,18 @@ class Model(object):
                                 'body_force': np.zeros(
                                     nwrites, dtype=np.float64)
                                 }
-                        for node in node_list:
-                            i, j = node
-                            # Add to tip data for the write index, ii
-                            data[tip_type]['displacement'][ii] += (
-                                u[i, j])
-                            data[tip_type]['velocity'][ii] += (
-                                ud[i, j])
-                            data[tip_type]['acceleration'][ii] += (
-                                udd[i, j])
-                            data[tip_type]['force'][ii] += (
-                                force[i, j] * self.volume[i])
-                            data[tip_type]['body_force'][ii] += (
-                                body_force[i, j] * self.volume[i])
+                        # Add to tip data for the write index, ii
+                        tip_volume = self.volume[tip_i]
+                        data[tip_type]['displacement'][ii] += np.sum(
+                            u[tip_i, tip_j])
+                        data[tip_type]['velocity'][ii] += np.sum(
+                            ud[tip_i, tip_j])
+                        data[tip_type]['acceleration'][ii] += np.sum(
+                            udd[tip_i, tip_j])
+                        data[tip_type]['force'][ii] += np.sum(
+                            force[tip_i, tip_j] * tip_volume)
+                        data[tip_type]['body_force'][ii] += np.sum(
+                            body_force[tip_i, tip_j] * tip_volume)
 
                     # Add to model data for the write index, ii
                     data['model']['step'][ii] = step
@@ -1358,11 +1413,11 @@ class Model(object):
 
                     damage_sum = np.sum(damage)
                     data['model']['damage_sum'][ii] = damage_sum
-                    if damage_sum > 0.05*self.nnodes:
-                        warnings.warn('Over 5% of bonds have broken!\
+                    if damage_sum > damage_warning_hi:
+                        warnings.warn('Over 70% of bonds have broken!\
                                       peridynamics simulation continuing')
-                    elif damage_sum > 0.7*self.nnodes:
-                        warnings.warn('Over 7% of bonds have broken!\
+                    elif damage_sum > damage_warning_lo:
+                        warnings.warn('Over 5% of bonds have broken!\
                                       peridynamics simulation continuing')
         for tip_type_str in data:
             # Average the nodal displacements, velocities and
@@ -1458,8 +1513,10 @@ class Model(object):
                                  " - 1), (expected {}, got {})".format(
                                      first_step + steps - 1,
                                      len(displacement_bc_magnitudes)))
-            displacement_bc_magnitudes = displacement_bc_magnitudes.astype(
-                np.float64)
+            # asarray is a view when the dtype already matches, so repeated
+            # simulate calls with the same magnitudes do not copy
+            displacement_bc_magnitudes = np.asarray(
+                displacement_bc_magnitudes, dtype=np.float64)
         else:
             raise TypeError("displacement_bc_magnitudes type is wrong "
                             "(expected {}, got {})".format(
@@ -1475,8 +1532,8 @@ class Model(object):
                                  " - 1), (expected {}, got {})".format(
                                      first_step + steps - 1,
                                      len(force_bc_magnitudes)))
-            force_bc_magnitudes = force_bc_magnitudes.astype(
-                np.float64)
+            force_bc_magnitudes = np.asarray(
+                force_bc_magnitudes, dtype=np.float64)
         else:
             raise TypeError("force_bc_magnitudes type is wrong "
                             "(expected {}, got {})".format(
@@ -1510,7 +1567,7 @@ class Model(object):
                                  "(expected {}, got {})".format(
                                      (self.nnodes, self.max_neighbours),
                                      np.shape(regimes)))
-            regimes = regimes.astype(np.intc)
+            regimes = np.asarray(regimes, dtype=np.intc)
         else:
             raise TypeError("regimes type is wrong "
                             "(expected {} or {}, got {})".format(
@@ -1597,17 +1654,19 @@ def initial_crack_helper(crack_function):
     :rtype: function
     """
     def initial_crack(coords, nlist, n_neigh):
-        crack = []
-
-        # Get all pairs of bonded nodes
-        nnodes = nlist.shape[0]
-        pairs = [(i, j) for i in range(nnodes) for j in nlist[i][0:n_neigh[i]]
-                 if i < j]
+        # Get all pairs of bonded nodes with a single broadcast mask over
+        # the neighbour list, counting each bond once from the
+        # lower-indexed node
+        nnodes, max_neighbours = nlist.shape
+        valid = np.arange(
+            max_neighbours)[np.newaxis, :] < n_neigh[:, np.newaxis]
+        node_i, neigh = np.nonzero(
+            valid & (np.arange(nnodes)[:, np.newaxis] < nlist))
+        node_j = nlist[node_i, neigh]
 
         # Check each pair using the crack function
-        for i, j in pairs:
-            if crack_function(coords[i], coords[j]):
-                crack.append((i, j))
+        crack = [(i, j) for i, j in zip(node_i, node_j)
+                 if crack_function(coords[i], coords[j])]
         return crack
     return initial_crack
 